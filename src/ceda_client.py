@@ -8,34 +8,288 @@ MODIS Fire_cci Burned Area Grid product, version 5.1
 """
 
 import os
-import sys
+import hashlib
+import shutil
+import json
+import threading
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import xarray as xr
 import numpy as np
+import dask
+import dask.array as da
 import pandas as pd
 from pathlib import Path
-from datetime import datetime, timedelta
-import time
+from collections import OrderedDict
 import warnings
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-import re
-warnings.filterwarnings('ignore')
+
+try:
+    # h5netcdf は h5py なしでもimportできるため、h5py も確認する
+    import h5py
+    import h5netcdf
+    H5NETCDF_AVAILABLE = True
+except ImportError:
+    H5NETCDF_AVAILABLE = False
+
+try:
+    import zarr
+    ZARR_AVAILABLE = True
+except ImportError:
+    ZARR_AVAILABLE = False
+
+try:
+    from shapely.geometry import box, Point
+    from shapely.prepared import prep
+    try:
+        from shapely import intersects_xy
+    except ImportError:
+        # shapely < 2: 境界上の点も含める（contains | touches）
+        from shapely.vectorized import contains as _contains_xy, touches as _touches_xy
+        
+        def intersects_xy(geometry, x, y):
+            return _contains_xy(geometry, x, y) | _touches_xy(geometry, x, y)
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
+
+try:
+    import rtree
+    RTREE_AVAILABLE = True
+except ImportError:
+    RTREE_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# 土地被覆クラス数（クラス値は 1..18）
+N_LAND_COVER_CLASSES = 18
+
+# サンプルデータのグリッド定義（0.25度解像度、読み取り専用・全インスタンスで共有）
+SAMPLE_LAT_GRID = np.arange(-90, 90.25, 0.25)
+SAMPLE_LON_GRID = np.arange(-180, 180.25, 0.25)
+SAMPLE_LAT_GRID.flags.writeable = False
+SAMPLE_LON_GRID.flags.writeable = False
+
+# NetCDF読み込みオプション
+# h5netcdf は netCDF4 よりGILを早く解放するため、スレッド並列のdask読み込みで高速。
+# 大陸サブセット読み込みは engine='h5netcdf' + ディスク上のチャンクに合わせた chunks が最速。
+# h5netcdf（h5py）が利用できない場合は xarray のデフォルトエンジン（netCDF4）を使用。
+if H5NETCDF_AVAILABLE:
+    NETCDF_OPEN_KWARGS = {'engine': 'h5netcdf'}
+else:
+    NETCDF_OPEN_KWARGS = {}
+
+if NUMBA_AVAILABLE:
+    # NaN判定（x == x）を保つため fastmath は nnan を除いたフラグのみ有効化
+    # （reassoc で浮動小数点リダクションのSIMD化を許可）
+    _FASTMATH_FLAGS = {'reassoc', 'contract', 'nsz'}
+    
+    @njit(parallel=True, fastmath=_FASTMATH_FLAGS, cache=True)
+    def _array_stats(values, threshold):
+        """
+        1回の走査で合計・最大・有効セル数・閾値超過セル数を計算（NaNは除外、分岐なし）
+        
+        2次元配列（非連続ビュー可）を行単位で prange して走査する。
+        """
+        total = 0.0
+        max_value = -np.inf
+        n_valid = 0
+        n_above = 0
+        n_rows, n_cols = values.shape
+        for r in prange(n_rows):
+            row_total = 0.0
+            row_max = -np.inf
+            row_valid = 0
+            row_above = 0
+            for c in range(n_cols):
+                x = values[r, c]
+                valid = x == x
+                row_total += x if valid else 0.0
+                row_max = max(row_max, x if valid else -np.inf)
+                row_valid += valid
+                row_above += x > threshold
+            total += row_total
+            max_value = max(max_value, row_max)
+            n_valid += row_valid
+            n_above += row_above
+        return total, max_value, n_valid, n_above
+    
+    @njit(parallel=True, fastmath=_FASTMATH_FLAGS, cache=True)
+    def _fused_stats(ba, conf, ba_threshold, conf_threshold):
+        """
+        焼損面積と信頼度の統計を1回の走査で同時に計算（同形状の2次元配列、分岐なし）
+        
+        行単位で prange し、列方向は内側ループで走査するため、isel で切り出した
+        非連続ビューもコピーせずに処理できる。
+        """
+        ba_total = 0.0
+        ba_max = -np.inf
+        ba_valid = 0
+        ba_above = 0
+        conf_total = 0.0
+        conf_max = -np.inf
+        conf_valid = 0
+        conf_above = 0
+        n_rows, n_cols = ba.shape
+        for r in prange(n_rows):
+            row_ba_total = 0.0
+            row_ba_max = -np.inf
+            row_ba_valid = 0
+            row_ba_above = 0
+            row_conf_total = 0.0
+            row_conf_max = -np.inf
+            row_conf_valid = 0
+            row_conf_above = 0
+            for c in range(n_cols):
+                x = ba[r, c]
+                x_valid = x == x
+                row_ba_total += x if x_valid else 0.0
+                row_ba_max = max(row_ba_max, x if x_valid else -np.inf)
+                row_ba_valid += x_valid
+                row_ba_above += x > ba_threshold
+                
+                y = conf[r, c]
+                y_valid = y == y
+                row_conf_total += y if y_valid else 0.0
+                row_conf_max = max(row_conf_max, y if y_valid else -np.inf)
+                row_conf_valid += y_valid
+                row_conf_above += y > conf_threshold
+            ba_total += row_ba_total
+            ba_max = max(ba_max, row_ba_max)
+            ba_valid += row_ba_valid
+            ba_above += row_ba_above
+            conf_total += row_conf_total
+            conf_max = max(conf_max, row_conf_max)
+            conf_valid += row_conf_valid
+            conf_above += row_conf_above
+        return (ba_total, ba_max, ba_valid, ba_above,
+                conf_total, conf_max, conf_valid, conf_above)
+    
+    @njit(parallel=True, fastmath=_FASTMATH_FLAGS, cache=True)
+    def _count_gt(values, threshold):
+        """閾値より大きい要素数を一時bool配列なしで計数（2次元配列、非連続ビュー可）"""
+        count = 0
+        n_rows, n_cols = values.shape
+        for r in prange(n_rows):
+            row_count = 0
+            for c in range(n_cols):
+                row_count += values[r, c] > threshold
+            count += row_count
+        return count
+
+
+def _as_2d(values):
+    """
+    Numbaカーネル用に配列を2次元へ変形（可能な限りコピーなしのビュー）
+    
+    末尾の次元を列、それ以外を行として扱う。先頭次元が結合できない非連続配列
+    （複数時刻のサブセットなど）のみ numpy の reshape がコピーを作成する。
+    """
+    values = np.asarray(values)
+    if values.ndim == 2:
+        return values
+    if values.ndim < 2:
+        return values.reshape(1, -1)
+    return values.reshape(-1, values.shape[-1])
+
+
+def _count_gt_chunk(x, axis=None, keepdims=True, threshold=0.0):
+    """dask reduction用: チャンク毎の閾値超過セル数（keepdims形状で返す）"""
+    count = _count_gt(_as_2d(x), threshold)
+    return np.full((1,) * x.ndim, count, dtype=np.int64)
+
+
+def _count_gt_dask(data, threshold):
+    """dask配列の閾値超過セル数（チャンク毎にNumbaカーネルで計数）"""
+    return da.reduction(
+        data,
+        chunk=partial(_count_gt_chunk, threshold=threshold),
+        aggregate=np.sum,
+        dtype=np.int64
+    )
+
+class RangeNotSupportedError(requests.exceptions.RequestException):
+    """Rangeリクエストに 206 以外で応答された（分割ダウンロード不可）"""
+
 
 class CEDAFireCCIClient:
     """CEDA Fire_cci データクライアント"""
     
-    def __init__(self, cache_dir="data/ceda_cache"):
+    # サンプルデータ用の共有座標インデックス（SAMPLE_*_GRID から初回生成時に作成）
+    _sample_coord_indexes = None
+    
+    def __init__(self, cache_dir="data/ceda_cache", max_cached_datasets=6,
+                 memory_cache_bytes=2 * 1024 ** 3):
         """
         初期化
         
         Args:
             cache_dir (str): キャッシュディレクトリパス
+            max_cached_datasets (int): メモリキャッシュに保持するデータセット数の上限
+            memory_cache_bytes (int): メモリキャッシュの上限（Dataset.nbytes 換算）
         """
         self.base_url = "https://data.ceda.ac.uk/neodc/esacci/fire/data/burned_area/MODIS/grid/v5.1"
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
+        # HTTPセッション（keep-aliveで接続を再利用）
+        self._session = None
+        self._pool_size = 0
+        self._session_lock = threading.Lock()
+        
+        # 条件付きGET用のバリデータ（ファイル名 -> ETag / Last-Modified）
+        self._validators_path = self.cache_dir / '.etags.json'
+        self._validators = self._load_validators()
+        self._validators_lock = threading.Lock()
+        
+        # サンプルグリッド（モジュール定数 SAMPLE_LAT_GRID / SAMPLE_LON_GRID への参照）
+        self.lat_grid = SAMPLE_LAT_GRID
+        self.lon_grid = SAMPLE_LON_GRID
+        
+        # Zarrミラーのチャンクサイズ（大陸単位の部分読み込み向け）
+        self.zarr_chunks = {'lat': 300, 'lon': 300}
+        # 変換に失敗した (NetCDFパス, mtime)。同じファイルの再変換を繰り返さない
+        self._zarr_failures = set()
+        
+        # Rangeリクエストによる分割ダウンロード設定
+        self.download_segments = 4
+        self.min_segment_size = 8 * 1024 * 1024  # 8 MiB未満は分割しない
+        
+        # 大陸境界定義（v3.1と同じ）
+        self.continent_bounds = {
+            'Africa': {'lat_range': (-35, 40), 'lon_range': (-20, 55)},
+            'Asia': {'lat_range': (5, 80), 'lon_range': (60, 180)},
+            'Europe': {'lat_range': (35, 75), 'lon_range': (-15, 60)},
+            'North America': {'lat_range': (15, 85), 'lon_range': (-170, -50)},
+            'South America': {'lat_range': (-60, 15), 'lon_range': (-85, -30)}
+        }
+        
+        # 大陸境界の整数インデックスキャッシュ: (グリッド署名, 大陸名) -> {'lat': slice, 'lon': slice}
+        self._bbox_cache = {}
+        
+        # ポリゴン境界を持つ地域: 名前 -> {'polygon': ポリゴン, 'lr': 内接矩形 (lon_min, lat_min, lon_max, lat_max)}
+        self.region_polygons = {}
+        self._mask_cache = {}
+        
+        # 地域外接矩形の空間インデックス（R-tree、未インストール時は線形探索）
+        self._region_index = None
+        self._build_region_index()
+        
+        # 読み込み済みデータセット・大陸別サブセットのLRUキャッシュ
+        # 値は (データセット, 推定バイト数)
+        self.max_cached_datasets = max_cached_datasets
+        self.memory_cache_bytes = memory_cache_bytes
+        self._ds_cache = OrderedDict()   # Path -> (Dataset, nbytes)
+        self._sub_cache = OrderedDict()  # (Path, 大陸名) -> (Dataset, nbytes)
+        self._ds_paths = {}              # id(Dataset) -> Path（キャッシュ中のデータセットのみ）
+        self._memory_cache_lock = threading.RLock()
+        
         # データ仕様
         self.data_info = {
             "product": "MODIS Fire_cci Burned Area Grid product v5.1",
@@ -111,14 +365,92 @@ class CEDAFireCCIClient:
         filename = self.build_filename(year, month)
         return self.cache_dir / filename
     
-    def download_monthly_data(self, year, month, force_download=False):
+    def _get_session(self, pool_size=8):
+        """
+        共有HTTPセッションを取得（初回のみ生成）
+        
+        既存のプールより大きいサイズが要求された場合はアダプタを付け替える。
+        
+        Args:
+            pool_size (int): コネクションプールサイズ
+            
+        Returns:
+            requests.Session: HTTPセッション
+        """
+        with self._session_lock:
+            if self._session is None:
+                self._session = requests.Session()
+            if pool_size > self._pool_size:
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+                self._pool_size = pool_size
+            return self._session
+    
+    def download_monthly_data(self, year, month, force_download=False, revalidate=True):
         """
         月次データをダウンロード
         
         Args:
             year (int): 年
             month (int): 月
-            force_download (bool): 強制ダウンロード
+            force_download (bool): キャッシュがあってもサーバーに更新を確認（ETag / Last-Modified
+                による条件付きリクエスト。未更新ならキャッシュを維持）
+            revalidate (bool): False の場合、条件付きリクエストを送らず常に再ダウンロード
+                （破損したキャッシュの取り直し用）
+            
+        Returns:
+            Path: ダウンロードされたファイルパス
+        """
+        # 1ファイルあたり最大 download_segments 本の接続を同時に使用
+        self._get_session(pool_size=max(1, self.download_segments))
+        return self._download_one(year, month, force_download, revalidate)
+    
+    def download_many(self, pairs, max_workers=8, force_download=False, revalidate=True):
+        """
+        複数月のデータを並列ダウンロード
+        
+        Args:
+            pairs (list): (年, 月) タプルのリスト
+            max_workers (int): 並列ダウンロード数
+            force_download (bool): キャッシュがあってもサーバーに更新を確認（ETag / Last-Modified
+                による条件付きリクエスト。未更新ならキャッシュを維持）
+            revalidate (bool): False の場合、条件付きリクエストを送らず常に再ダウンロード
+                （破損したキャッシュの取り直し用）
+            
+        Returns:
+            dict: (年, 月) -> ダウンロードされたファイルパス（失敗時はNone）
+        """
+        # 重複した月は1回だけ取得（同じ .part ファイルへの同時書き込みを防ぐ）
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return {}
+        
+        # 全スレッドで1つのセッションを共有（TLSハンドシェイクはホスト毎に1回）
+        # 各ワーカーが分割ダウンロードで download_segments 本の接続を使うため、その分プールを確保
+        self._get_session(pool_size=max_workers * max(1, self.download_segments))
+        
+        print(f"  🚀 並列ダウンロード: {len(pairs)}ファイル (workers={max_workers})")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                (year, month): executor.submit(self._download_one, year, month, force_download, revalidate)
+                for year, month in pairs
+            }
+            results = {pair: future.result() for pair, future in futures.items()}
+        
+        return results
+    
+    def _download_one(self, year, month, force_download=False, revalidate=True):
+        """
+        1ヶ月分のデータをダウンロード（共有セッション使用）
+        
+        Args:
+            year (int): 年
+            month (int): 月
+            force_download (bool): キャッシュがあってもサーバーに更新を確認（ETag / Last-Modified
+                による条件付きリクエスト。未更新ならキャッシュを維持）
+            revalidate (bool): False の場合、条件付きリクエストを送らず常に再ダウンロード
+                （破損したキャッシュの取り直し用）
             
         Returns:
             Path: ダウンロードされたファイルパス
@@ -128,6 +460,7 @@ class CEDAFireCCIClient:
         # キャッシュ確認
         if cache_path.exists() and not force_download:
             print(f"  📦 キャッシュから読み込み: {cache_path.name}")
+            self._ensure_zarr(cache_path)
             return cache_path
         
         # ダウンロード実行
@@ -135,82 +468,696 @@ class CEDAFireCCIClient:
         print(f"  🌐 ダウンロード開始: {year}-{month:02d}")
         print(f"     URL: {url}")
         
+        # 一時ファイルに書き込み、完了後にアトミックに置き換え
+        part_path = cache_path.with_suffix(cache_path.suffix + '.part')
+        
+        # 既存キャッシュがあれば条件付きリクエストで更新有無を確認
+        conditional_headers = self._conditional_headers(cache_path) if revalidate else None
+        
         try:
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
+            probe = self._probe(url, headers=conditional_headers)
+            
+            if conditional_headers and self._is_not_modified(cache_path, probe['status'], probe['headers']):
+                print(f"  📦 更新なし（304 Not Modified）: {cache_path.name}")
+                self._ensure_zarr(cache_path)
+                return cache_path
+            
+            use_ranges = bool(
+                probe['accept_ranges'] and probe['size'] and probe['size'] >= self.min_segment_size
+            )
+            if use_ranges:
+                # 分割並列ダウンロード
+                try:
+                    self._download_ranges(url, part_path, probe['size'])
+                    expected_size = probe['size']
+                    response_headers = probe['headers']
+                except RangeNotSupportedError as e:
+                    # Accept-Ranges を返しつつ Range を無視するサーバーは単一ストリームで再取得
+                    print(f"  ⚠️ {e}、単一ストリームで再試行")
+                    use_ranges = False
+            
+            if not use_ranges:
+                # 単一ストリームダウンロード
+                with self._session.get(url, headers=conditional_headers, stream=True, timeout=30) as response:
+                    response.raise_for_status()
+                    
+                    if conditional_headers and self._is_not_modified(cache_path, response.status_code, response.headers):
+                        print(f"  📦 更新なし（304 Not Modified）: {cache_path.name}")
+                        self._ensure_zarr(cache_path)
+                        return cache_path
+                    response_headers = response.headers
+                    
+                    # ファイル保存（1 MiBバッファで raw から直接読み込み、MD5を逐次計算）
+                    md5 = hashlib.md5()
+                    with open(part_path, 'wb') as f:
+                        for chunk in self._iter_raw_chunks(response):
+                            f.write(chunk)
+                            md5.update(chunk)
+                    
+                    expected_size = self._expected_size(response)
+                    self._verify_etag(response.headers.get('ETag'), md5.hexdigest())
             
-            # ファイル保存
-            with open(cache_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            actual_size = part_path.stat().st_size
+            if expected_size is not None and actual_size != expected_size:
+                raise requests.exceptions.RequestException(
+                    f"サイズ不一致: 期待={expected_size} bytes, 受信={actual_size} bytes"
+                )
+            
+            # 旧データのZarrミラーが新しいNetCDFより優先されないよう先に削除
+            self._remove_zarr(cache_path)
+            os.replace(part_path, cache_path)
+            self.invalidate_memory_cache(cache_path)
+            self._store_validators(cache_path, response_headers)
             
             file_size = cache_path.stat().st_size / (1024 * 1024)  # MB
             print(f"  ✅ ダウンロード完了: {cache_path.name} ({file_size:.1f} MB)")
+            self._ensure_zarr(cache_path, overwrite=True)
             return cache_path
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
             print(f"  ❌ ダウンロードエラー: {e}")
             return None
+        
+        finally:
+            # 中断・失敗時に不完全な一時ファイルを残さない
+            if part_path.exists():
+                part_path.unlink()
+    
+    @staticmethod
+    def _expected_size(response):
+        """
+        レスポンスの Content-Length から期待ファイルサイズを取得
+        
+        Content-Encoding が付与されている場合は展開後のサイズと一致しないためNone。
+        
+        Args:
+            response (requests.Response): レスポンス
+            
+        Returns:
+            int: 期待サイズ（バイト）、不明な場合はNone
+        """
+        if response.headers.get('Content-Encoding'):
+            return None
+        content_length = response.headers.get('Content-Length')
+        return int(content_length) if content_length and content_length.isdigit() else None
+    
+    @staticmethod
+    def _verify_etag(etag, md5_hex):
+        """
+        ETag がMD5形式の場合、受信データのMD5と照合
+        
+        Args:
+            etag (str): ETag ヘッダ値（またはNone）
+            md5_hex (str): 受信データのMD5
+        """
+        if not etag or etag.startswith('W/'):
+            return
+        etag = etag.strip('"').lower()
+        if len(etag) == 32 and all(c in '0123456789abcdef' for c in etag) and etag != md5_hex:
+            raise requests.exceptions.RequestException(
+                f"MD5不一致: ETag={etag}, 受信={md5_hex}"
+            )
+    
+    def _probe(self, url, headers=None):
+        """
+        HEADリクエストでファイルサイズとRange対応を確認
+        
+        Args:
+            url (str): ダウンロードURL
+            headers (dict): 追加リクエストヘッダ（条件付きリクエスト用）
+            
+        Returns:
+            dict: size (int or None), accept_ranges (bool), status (int or None), headers (dict)
+        """
+        try:
+            response = self._session.head(url, headers=headers, allow_redirects=True, timeout=30)
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            return {'size': None, 'accept_ranges': False, 'status': None, 'headers': {}}
+        
+        content_length = response.headers.get('Content-Length')
+        size = int(content_length) if content_length and content_length.isdigit() else None
+        accept_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+        
+        return {
+            'size': size,
+            'accept_ranges': accept_ranges,
+            'status': response.status_code,
+            'headers': response.headers
+        }
+    
+    def _load_validators(self):
+        """
+        保存済みの ETag / Last-Modified を読み込み
+        
+        Returns:
+            dict: ファイル名 -> {'etag': str, 'last_modified': str}
+        """
+        if not self._validators_path.exists():
+            return {}
+        try:
+            with open(self._validators_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _store_validators(self, cache_path, headers):
+        """
+        レスポンスヘッダの ETag / Last-Modified を保存
+        
+        Args:
+            cache_path (Path): キャッシュファイルパス
+            headers (dict): レスポンスヘッダ
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        
+        with self._validators_lock:
+            if etag or last_modified:
+                self._validators[cache_path.name] = {'etag': etag, 'last_modified': last_modified}
+            else:
+                self._validators.pop(cache_path.name, None)
+            
+            tmp_path = self._validators_path.with_suffix('.json.part')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._validators, f, indent=2)
+            os.replace(tmp_path, self._validators_path)
+    
+    def _conditional_headers(self, cache_path):
+        """
+        既存キャッシュに対する条件付きリクエストヘッダを構築
+        
+        Args:
+            cache_path (Path): キャッシュファイルパス
+            
+        Returns:
+            dict: If-None-Match / If-Modified-Since ヘッダ（条件なしの場合はNone）
+        """
+        if not cache_path.exists():
+            return None
+        
+        validators = self._validators.get(cache_path.name, {})
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers or None
+    
+    def _is_not_modified(self, cache_path, status, headers):
+        """
+        既存キャッシュが最新か判定（304、または ETag が一致）
+        
+        Args:
+            cache_path (Path): キャッシュファイルパス
+            status (int): HTTPステータス
+            headers (dict): レスポンスヘッダ
+            
+        Returns:
+            bool: 再ダウンロード不要か
+        """
+        if status == 304:
+            return True
+        stored_etag = self._validators.get(cache_path.name, {}).get('etag')
+        return bool(status == 200 and stored_etag and headers.get('ETag') == stored_etag)
+    
+    def _download_ranges(self, url, path, size):
+        """
+        Rangeリクエストでファイルを分割し並列ダウンロード
+        
+        Args:
+            url (str): ダウンロードURL
+            path (Path): 保存先パス
+            size (int): ファイルサイズ（バイト）
+        """
+        # 保存先を事前確保
+        with open(path, 'wb') as f:
+            f.truncate(size)
+        
+        n_segments = max(1, self.download_segments)
+        segment_size = -(-size // n_segments)  # 切り上げ
+        ranges = [
+            (start, min(start + segment_size, size) - 1)
+            for start in range(0, size, segment_size)
+        ]
+        
+        print(f"     分割ダウンロード: {len(ranges)}セグメント")
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(self._download_segment, url, path, start, end)
+                for start, end in ranges
+            ]
+            for future in futures:
+                future.result()
+    
+    @staticmethod
+    def _iter_raw_chunks(response, chunk_size=1 << 20):
+        """
+        レスポンス本体を raw ストリームから再利用バッファに読み込みながら返す
+        
+        iter_content の小さなチャンク毎のPython処理を避け、1 MiB単位で
+        urllib3 の readinto に読み込む。返すmemoryviewは次の反復で上書きされるため、
+        呼び出し側はその場で書き込み・ハッシュ更新すること。
+        
+        Args:
+            response (requests.Response): stream=True のレスポンス
+            chunk_size (int): バッファサイズ（バイト）
+            
+        Yields:
+            memoryview: 受信データ
+        """
+        response.raw.decode_content = True
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            n = response.raw.readinto(buffer)
+            if not n:
+                break
+            yield view[:n]
+    
+    def _download_segment(self, url, path, start, end):
+        """
+        指定バイト範囲をダウンロードしてファイルの該当位置に書き込み
+        
+        Args:
+            url (str): ダウンロードURL
+            path (Path): 保存先パス
+            start (int): 開始バイト
+            end (int): 終了バイト（含む）
+        """
+        headers = {'Range': f'bytes={start}-{end}'}
+        with self._session.get(url, headers=headers, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RangeNotSupportedError(
+                    f"Rangeリクエスト非対応のレスポンス: {response.status_code}"
+                )
+            
+            offset = start
+            with open(path, 'r+b') as f:
+                fd = f.fileno()
+                for chunk in self._iter_raw_chunks(response):
+                    # 共有シーク位置を使わずオフセット指定で書き込み
+                    if hasattr(os, 'pwrite'):
+                        os.pwrite(fd, chunk, offset)
+                    else:
+                        f.seek(offset)
+                        f.write(chunk)
+                    offset += len(chunk)
+        
+        if offset != end + 1:
+            raise requests.exceptions.RequestException(
+                f"セグメント不完全: bytes={start}-{end} ({offset - start} bytes受信)"
+            )
     
     def load_netcdf_data(self, file_path):
         """
-        NetCDFファイルを読み込み
+        NetCDFファイルを遅延読み込み（daskチャンク）
+        
+        NetCDFより新しいZarrミラーが存在する場合はそちらを優先して開く。
+        各変数はディスク上のチャンクサイズ（encoding['chunksizes']）に
+        合わせたdask配列として開かれるため、読み込み時点では実データを
+        メモリに展開しない。サブセット化の後に .load() / .compute()
+        （または .values）で必要なチャンクのみ読み込むこと。
+        開いたデータセットはメモリ上のLRUキャッシュに保持され、同じファイルの
+        再読み込みや get_continental_subset の繰り返しはキャッシュから返す。
         
         Args:
             file_path (Path): ファイルパス
             
         Returns:
-            xarray.Dataset: データセット
+            xarray.Dataset: データセット（dask配列ベース）
         """
-        try:
-            print(f"  📊 NetCDF読み込み: {file_path.name}")
-            dataset = xr.open_dataset(file_path)
+        key = Path(file_path).resolve()
+        cached = self._memory_cache_get(self._ds_cache, key)
+        if cached is not None:
+            print(f"  ♻️ メモリキャッシュから取得: {Path(file_path).name}")
+            return cached
+        
+        dataset = self._open_dataset(file_path)
+        if dataset is not None:
+            self._memory_cache_put(self._ds_cache, key, dataset)
+        return dataset
+    
+    def _open_dataset(self, file_path):
+        """
+        Zarrミラーまたは NetCDF ファイルを開く（メモリキャッシュなし）
+        
+        Args:
+            file_path (Path): ファイルパス
+            
+        Returns:
+            xarray.Dataset: データセット（失敗時はNone）
+        """
+        # 読み込み時の警告（CF属性など）はこの範囲のみ抑制
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            
+            zarr_path = self.get_zarr_path(file_path)
+            if ZARR_AVAILABLE and self._zarr_is_current(file_path):
+                try:
+                    print(f"  📊 Zarr読み込み: {zarr_path.name}")
+                    return xr.open_zarr(zarr_path, chunks='auto', consolidated=True)
+                except Exception as e:
+                    print(f"  ⚠️ Zarr読み込み失敗、NetCDFを使用: {e}")
+            
+            try:
+                print(f"  📊 NetCDF読み込み: {file_path.name}")
+                dataset = xr.open_dataset(file_path, chunks={}, **NETCDF_OPEN_KWARGS)
+                dataset = self._rechunk_to_disk_chunks(dataset)
+            
+                # データセット情報を表示
+                print(f"     座標次元: {list(dataset.coords.keys())}")
+                print(f"     データ変数: {list(dataset.data_vars.keys())}")
+            
+                return dataset
+            
+            except Exception as e:
+                print(f"  ❌ NetCDF読み込みエラー: {e}")
+                return None
+    
+    def _memory_cache_get(self, cache, key):
+        """
+        LRUキャッシュから取得（ヒット時は最新使用に更新）
+        
+        Args:
+            cache (OrderedDict): 対象キャッシュ
+            key: キャッシュキー
+            
+        Returns:
+            xarray.Dataset: キャッシュ済みデータセット（なければNone）
+        """
+        with self._memory_cache_lock:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            cache.move_to_end(key)
+            return entry[0]
+    
+    def _memory_cache_put(self, cache, key, dataset):
+        """
+        LRUキャッシュに登録し、上限を超えた古いエントリを破棄
+        
+        Args:
+            cache (OrderedDict): 対象キャッシュ
+            key: キャッシュキー
+            dataset (xarray.Dataset): データセット
+        """
+        with self._memory_cache_lock:
+            if cache is self._ds_cache:
+                old = cache.get(key)
+                if old is not None:
+                    self._ds_paths.pop(id(old[0]), None)
+                self._ds_paths[id(dataset)] = key
+            cache[key] = (dataset, int(dataset.nbytes))
+            cache.move_to_end(key)
+            self._evict_memory_cache()
+    
+    def _evict_memory_cache(self):
+        """データセット数・バイト数の上限を超えた分をLRU順に破棄（サブセットを先に破棄）"""
+        while len(self._ds_cache) > self.max_cached_datasets:
+            self._drop_dataset(next(iter(self._ds_cache)))
+        
+        total = sum(n for _, n in self._ds_cache.values()) + sum(n for _, n in self._sub_cache.values())
+        while total > self.memory_cache_bytes and (self._sub_cache or self._ds_cache):
+            if self._sub_cache:
+                _, (_, nbytes) = self._sub_cache.popitem(last=False)
+                total -= nbytes
+            else:
+                total -= self._drop_dataset(next(iter(self._ds_cache)))
+    
+    def _drop_dataset(self, key):
+        """
+        データセットとそのサブセットをキャッシュから削除
+        
+        Args:
+            key (Path): データセットのキャッシュキー
+            
+        Returns:
+            int: 解放したバイト数（推定）
+        """
+        dataset, freed = self._ds_cache.pop(key)
+        self._ds_paths.pop(id(dataset), None)
+        for sub_key in [k for k in self._sub_cache if k[0] == key]:
+            freed += self._sub_cache.pop(sub_key)[1]
+        return freed
+    
+    def _cached_source_path(self, dataset):
+        """
+        メモリキャッシュ中のデータセットであれば元ファイルのキーを返す
+        
+        Args:
+            dataset (xarray.Dataset): データセット
+            
+        Returns:
+            Path: キャッシュキー（キャッシュ外のデータセットはNone）
+        """
+        with self._memory_cache_lock:
+            key = self._ds_paths.get(id(dataset))
+            if key is not None and self._ds_cache.get(key, (None,))[0] is dataset:
+                return key
+            return None
+    
+    def invalidate_memory_cache(self, file_path=None):
+        """
+        メモリキャッシュを破棄
+        
+        Args:
+            file_path (Path): 対象ファイル（Noneの場合は全て破棄）
+        """
+        with self._memory_cache_lock:
+            if file_path is None:
+                self._ds_cache.clear()
+                self._sub_cache.clear()
+                self._ds_paths.clear()
+                return
+            key = Path(file_path).resolve()
+            if key in self._ds_cache:
+                self._drop_dataset(key)
+    
+    def _rechunk_to_disk_chunks(self, dataset):
+        """
+        各データ変数をディスク上のチャンクサイズに合わせて再チャンク
+        
+        Args:
+            dataset (xarray.Dataset): データセット
             
-            # データセット情報を表示
-            print(f"     座標次元: {list(dataset.coords.keys())}")
-            print(f"     データ変数: {list(dataset.data_vars.keys())}")
+        Returns:
+            xarray.Dataset: 再チャンク後のデータセット
+        """
+        for name in list(dataset.data_vars):
+            chunksizes = dataset[name].encoding.get('chunksizes')
+            if chunksizes and len(chunksizes) == dataset[name].ndim:
+                dataset[name] = dataset[name].chunk(dict(zip(dataset[name].dims, chunksizes)))
+        return dataset
+    
+    def load_months(self, months, chunks=None):
+        """
+        複数月のNetCDFキャッシュを1つのデータセットとして遅延読み込み
+        
+        xr.open_mfdataset で各ファイルを並列に開き time 次元で結合するため、
+        年間合計などのファイル横断集約をdaskが1つのグラフで処理できる。
+        
+        Args:
+            months (list): (年, 月) タプルのリスト
+            chunks (dict): daskチャンクサイズ（デフォルト: lat/lon 300）
             
+        Returns:
+            xarray.Dataset: time 次元で結合したデータセット（キャッシュが1つもない場合はNone）
+        """
+        if chunks is None:
+            chunks = {'lat': 300, 'lon': 300}
+        
+        paths = []
+        for year, month in months:
+            cache_path = self.get_cache_path(year, month)
+            if cache_path.exists():
+                paths.append(cache_path)
+            else:
+                print(f"  ⚠️ キャッシュなし（スキップ）: {cache_path.name}")
+        
+        if not paths:
+            print("  ❌ 読み込み可能な月データがありません")
+            return None
+        
+        try:
+            print(f"  📊 複数月NetCDF読み込み: {len(paths)}ファイル")
+            dataset = xr.open_mfdataset(
+                paths,
+                chunks=chunks,
+                parallel=True,
+                combine='nested',
+                concat_dim='time',
+                **NETCDF_OPEN_KWARGS
+            )
+            self._check_chunk_alignment(dataset, chunks)
             return dataset
             
         except Exception as e:
-            print(f"  ❌ NetCDF読み込みエラー: {e}")
+            print(f"  ❌ 複数月NetCDF読み込みエラー: {e}")
+            return None
+    
+    def load_year(self, year, chunks=None):
+        """
+        1年分の月次データを遅延読み込み
+        
+        Args:
+            year (int): 年
+            chunks (dict): daskチャンクサイズ
+            
+        Returns:
+            xarray.Dataset: time 次元で結合したデータセット
+        """
+        months = [(year, month) for month in self.get_available_months(year)]
+        return self.load_months(months, chunks=chunks)
+    
+    def _check_chunk_alignment(self, dataset, chunks):
+        """
+        指定チャンクがディスク上のチャンクサイズの倍数でない場合に警告
+        
+        Args:
+            dataset (xarray.Dataset): データセット
+            chunks (dict): 指定したdaskチャンクサイズ
+        """
+        for name in dataset.data_vars:
+            chunksizes = dataset[name].encoding.get('chunksizes')
+            if not chunksizes:
+                continue
+            for dim, disk_size in zip(dataset[name].dims, chunksizes):
+                size = chunks.get(dim)
+                if isinstance(size, int) and size > 0 and size % disk_size != 0:
+                    print(f"  ⚠️ チャンク不整合: {name}.{dim} "
+                          f"指定={size}, ディスク={disk_size}（読み込み効率が低下します）")
+    
+    def get_zarr_path(self, file_path):
+        """
+        NetCDFキャッシュに対応するZarrミラーのパスを取得
+        
+        Args:
+            file_path (Path): NetCDFファイルパス
+            
+        Returns:
+            Path: Zarrストアパス
+        """
+        return Path(file_path).with_suffix('.zarr')
+    
+    def _ensure_zarr(self, cache_path, overwrite=False):
+        """
+        NetCDFキャッシュからZarrミラーを作成（月ファイル毎に1回）
+        
+        Args:
+            cache_path (Path): NetCDFファイルパス
+            overwrite (bool): 既存のZarrストアを上書き
+            
+        Returns:
+            Path: Zarrストアパス（作成できない場合はNone）
+        """
+        if not ZARR_AVAILABLE:
+            return None
+        
+        zarr_path = self.get_zarr_path(cache_path)
+        if not overwrite and self._zarr_is_current(cache_path):
+            return zarr_path
+        
+        # 同一内容（同じmtime）のNetCDFで失敗済みなら再試行しない
+        failure_key = self._zarr_failure_key(cache_path)
+        if failure_key in self._zarr_failures:
+            return None
+        
+        try:
+            print(f"  🗜️ Zarrミラー作成: {zarr_path.name}")
+            with xr.open_dataset(cache_path, **NETCDF_OPEN_KWARGS) as dataset:
+                chunks = {dim: size for dim, size in self.zarr_chunks.items() if dim in dataset.dims}
+                dataset = dataset.chunk(chunks)
+                
+                # NetCDF固有のエンコーディング（チャンク・圧縮設定）はZarrに引き継がない
+                for name in dataset.variables:
+                    dataset[name].encoding = {
+                        key: value for key, value in dataset[name].encoding.items()
+                        if key in ('dtype', '_FillValue', 'scale_factor', 'add_offset', 'units', 'calendar')
+                    }
+                
+                dataset.to_zarr(zarr_path, mode='w', consolidated=True)
+            return zarr_path
+            
+        except Exception as e:
+            print(f"  ⚠️ Zarrミラー作成エラー: {e}")
+            # 不完全・古いミラーを残さない（以降はNetCDFから読み込む）
+            self._remove_zarr(cache_path)
+            self._zarr_failures.add(failure_key)
             return None
     
-    def create_sample_data(self, year=2022, month=1):
+    @staticmethod
+    def _zarr_failure_key(cache_path):
+        """
+        Zarr変換失敗の記録キー（NetCDFが更新されれば別キーになる）
+        
+        Args:
+            cache_path (Path): NetCDFファイルパス
+            
+        Returns:
+            tuple: (解決済みパス, mtime)
+        """
+        path = Path(cache_path).resolve()
+        try:
+            return (path, path.stat().st_mtime)
+        except OSError:
+            return (path, None)
+    
+    def _zarr_is_current(self, cache_path):
+        """
+        Zarrミラーが存在し、NetCDFキャッシュより新しいか判定
+        
+        Args:
+            cache_path (Path): NetCDFファイルパス
+            
+        Returns:
+            bool: ミラーを使用可能か
+        """
+        zarr_path = self.get_zarr_path(cache_path)
+        if not zarr_path.exists():
+            return False
+        try:
+            return zarr_path.stat().st_mtime >= Path(cache_path).stat().st_mtime
+        except OSError:
+            return False
+    
+    def _remove_zarr(self, cache_path):
+        """
+        NetCDFキャッシュに対応するZarrミラーを削除
+        
+        Args:
+            cache_path (Path): NetCDFファイルパス
+        """
+        zarr_path = self.get_zarr_path(cache_path)
+        if zarr_path.exists():
+            shutil.rmtree(zarr_path, ignore_errors=True)
+    
+    def create_sample_data(self, year=2022, month=1, seed=None):
         """
         サンプルデータを生成（実際のCEDAデータが利用できない場合）
         
         Args:
             year (int): 年
             month (int): 月
+            seed (int): 乱数シード（Noneの場合は非決定的）
             
         Returns:
             xarray.Dataset: サンプルデータセット
         """
         print(f"  🎲 サンプルデータ生成: {year}-{month:02d}")
         
-        # グリッド定義（0.25度解像度）
-        lat = np.arange(-90, 90.25, 0.25)
-        lon = np.arange(-180, 180.25, 0.25)
-        
-        # サンプル焼損面積データ
-        burned_area = np.random.exponential(scale=0.1, size=(len(lat), len(lon)))
-        burned_area = np.where(burned_area > 1, 0, burned_area)  # 現実的な値に制限
+        arrays = self._make_sample_arrays(year, month, seed=seed)
+        coord_indexes = self._get_sample_coord_indexes()
         
-        # サンプル信頼度データ
-        confidence = np.random.uniform(0.5, 1.0, size=(len(lat), len(lon)))
-        
-        # 土地被覆クラス（18クラス）
-        land_cover = np.random.randint(1, 19, size=(len(lat), len(lon)))
-        
-        # xarrayデータセット作成
+        # xarrayデータセット作成（座標インデックスは全呼び出しで共有）
         dataset = xr.Dataset({
-            'burned_area': (['lat', 'lon'], burned_area),
-            'confidence': (['lat', 'lon'], confidence),
-            'land_cover': (['lat', 'lon'], land_cover),
+            'burned_area': (['lat', 'lon'], arrays['burned_area']),
+            'confidence': (['lat', 'lon'], arrays['confidence']),
+            'land_cover': (['lat', 'lon'], arrays['land_cover'], {'valid_range': [1, N_LAND_COVER_CLASSES]}),
         }, coords={
-            'lat': lat,
-            'lon': lon,
+            'lat': coord_indexes['lat'],
+            'lon': coord_indexes['lon'],
             'time': pd.Timestamp(f'{year}-{month:02d}-01')
         })
         
@@ -224,10 +1171,69 @@ class CEDAFireCCIClient:
         
         return dataset
     
+    def _make_sample_arrays(self, year=2022, month=1, seed=None):
+        """
+        サンプルデータのnumpy配列を生成（xarray変換なし）
+        
+        ベンチマークやメモリ上の統計計算など、Dataset構築のオーバーヘッドが
+        不要な用途向け。
+        
+        Args:
+            year (int): 年
+            month (int): 月
+            seed (int): 乱数シード（Noneの場合は非決定的）
+            
+        Returns:
+            dict: burned_area / confidence / land_cover / lat / lon の配列
+        """
+        rng = np.random.default_rng(seed)
+        
+        lat = SAMPLE_LAT_GRID
+        lon = SAMPLE_LON_GRID
+        shape = (len(lat), len(lon))
+        
+        # サンプル焼損面積データ（float32、scale=0.1の指数分布）
+        burned_area = rng.standard_exponential(size=shape, dtype=np.float32)
+        burned_area *= np.float32(0.1)
+        np.putmask(burned_area, burned_area > 1, 0.0)  # 現実的な値に制限（インプレース）
+        
+        # サンプル信頼度データ（float32、0.5-1.0の一様分布）
+        confidence = rng.random(size=shape, dtype=np.float32)
+        confidence *= np.float32(0.5)
+        confidence += np.float32(0.5)
+        
+        # 土地被覆クラス（18クラス、uint8）
+        land_cover = rng.integers(1, N_LAND_COVER_CLASSES + 1, size=shape, dtype=np.uint8)
+        
+        return {
+            'burned_area': burned_area,
+            'confidence': confidence,
+            'land_cover': land_cover,
+            'lat': lat,
+            'lon': lon
+        }
+    
+    def _get_sample_coord_indexes(self):
+        """
+        サンプルグリッドの座標インデックスを取得（クラス全体で1回だけ生成）
+        
+        Returns:
+            dict: 'lat' / 'lon' -> pandas.Index
+        """
+        cls = type(self)
+        if cls._sample_coord_indexes is None:
+            cls._sample_coord_indexes = {
+                'lat': pd.Index(SAMPLE_LAT_GRID, name='lat'),
+                'lon': pd.Index(SAMPLE_LON_GRID, name='lon')
+            }
+        return cls._sample_coord_indexes
+    
     def get_continental_subset(self, dataset, continent):
         """
         大陸別データサブセットを取得
         
+        境界の整数インデックスはグリッド毎に1回だけ計算し、以降はisel で切り出す。
+        
         Args:
             dataset (xarray.Dataset): データセット
             continent (str): 大陸名
@@ -235,35 +1241,334 @@ class CEDAFireCCIClient:
         Returns:
             xarray.Dataset: 大陸別サブセット
         """
-        # 大陸境界定義（v3.1と同じ）
-        continent_bounds = {
-            'Africa': {'lat_range': (-35, 40), 'lon_range': (-20, 55)},
-            'Asia': {'lat_range': (5, 80), 'lon_range': (60, 180)},
-            'Europe': {'lat_range': (35, 75), 'lon_range': (-15, 60)},
-            'North America': {'lat_range': (15, 85), 'lon_range': (-170, -50)},
-            'South America': {'lat_range': (-60, 15), 'lon_range': (-85, -30)}
-        }
-        
-        if continent not in continent_bounds:
+        if continent not in self.continent_bounds:
             raise ValueError(f"未対応の大陸: {continent}")
         
-        bounds = continent_bounds[continent]
-        lat_min, lat_max = bounds['lat_range']
-        lon_min, lon_max = bounds['lon_range']
+        # load_netcdf_data でキャッシュ済みのデータセットはサブセットもキャッシュ
+        source_path = self._cached_source_path(dataset)
+        if source_path is not None:
+            cached = self._memory_cache_get(self._sub_cache, (source_path, continent))
+            if cached is not None:
+                print(f"  ♻️ {continent}サブセット（メモリキャッシュ）: {cached.lat.size}x{cached.lon.size} グリッド")
+                return cached
         
-        # データサブセット
-        subset = dataset.sel(
-            lat=slice(lat_min, lat_max),
-            lon=slice(lon_min, lon_max)
-        )
+        # データサブセット（外接矩形で切り出し）
+        grid_key = self._grid_key(dataset)
+        indexers = self._get_bbox_indexers(dataset, continent, grid_key)
+        subset = dataset.isel(**indexers)
+        
+        # ポリゴン境界を持つ地域は外側セルをマスク
+        if continent in self.region_polygons:
+            mask = self._get_polygon_mask(subset, continent, grid_key)
+            subset = subset.where(xr.DataArray(mask, dims=('lat', 'lon')))
+        
+        if source_path is not None:
+            self._memory_cache_put(self._sub_cache, (source_path, continent), subset)
         
         print(f"  🌍 {continent}サブセット: {subset.lat.size}x{subset.lon.size} グリッド")
         return subset
     
+    @staticmethod
+    def _grid_key(dataset):
+        """
+        同一グリッドを識別する署名（lat/lon のサイズと端点）
+        
+        Args:
+            dataset (xarray.Dataset): データセット
+            
+        Returns:
+            tuple: グリッド署名
+        """
+        return tuple(
+            (v.size, float(v[0]), float(v[-1])) if v.size else (0,)
+            for v in (dataset['lat'].values, dataset['lon'].values)
+        )
+    
+    def _get_bbox_indexers(self, dataset, continent, grid_key=None):
+        """
+        大陸境界に対応する lat/lon の整数スライスを取得（キャッシュ付き）
+        
+        Args:
+            dataset (xarray.Dataset): データセット
+            continent (str): 大陸名
+            grid_key (tuple): グリッド署名（省略時は計算）
+            
+        Returns:
+            dict: {'lat': slice, 'lon': slice}
+        """
+        if grid_key is None:
+            grid_key = self._grid_key(dataset)
+        cache_key = (grid_key, continent)
+        
+        cached = self._bbox_cache.get(cache_key)
+        if cached is None:
+            bounds = self.continent_bounds[continent]
+            cached = {
+                'lat': self._coord_slice(dataset['lat'].values, *bounds['lat_range']),
+                'lon': self._coord_slice(dataset['lon'].values, *bounds['lon_range'])
+            }
+            self._bbox_cache[cache_key] = cached
+        
+        return cached
+    
+    @staticmethod
+    def _coord_slice(values, vmin, vmax):
+        """
+        単調な座標配列で [vmin, vmax] に含まれる範囲の整数スライスを計算
+        
+        Args:
+            values (numpy.ndarray): 座標値（昇順または降順）
+            vmin (float): 下限（含む）
+            vmax (float): 上限（含む）
+            
+        Returns:
+            slice: 整数インデックススライス
+        """
+        n = values.size
+        if n > 1 and values[0] > values[-1]:
+            # 降順座標（例: 北→南の緯度）
+            ascending = values[::-1]
+            start = n - np.searchsorted(ascending, vmax, side='right')
+            stop = n - np.searchsorted(ascending, vmin, side='left')
+        else:
+            start = np.searchsorted(values, vmin, side='left')
+            stop = np.searchsorted(values, vmax, side='right')
+        return slice(int(start), int(stop))
+    
+    def register_region(self, name, polygon, lr_resolution=64):
+        """
+        ポリゴン境界を持つ地域を登録
+        
+        外接矩形（MBR）を continent_bounds に登録し、内接矩形（LR）を事前計算する。
+        サブセット時はMBRで切り出し、LR内のセルは無条件に採用、
+        MBRとLRの間の帯状領域のみポリゴン内外判定（境界上を含む）を行う。
+        
+        Args:
+            name (str): 地域名
+            polygon (shapely.geometry.Polygon): 地域境界（経度, 緯度）
+            lr_resolution (int): 内接矩形探索のラスタ分割数
+        """
+        if not SHAPELY_AVAILABLE:
+            raise ImportError("ポリゴン地域の登録には shapely が必要です")
+        
+        lon_min, lat_min, lon_max, lat_max = polygon.bounds
+        self.continent_bounds[name] = {
+            'lat_range': (lat_min, lat_max),
+            'lon_range': (lon_min, lon_max)
+        }
+        self.region_polygons[name] = {
+            'polygon': polygon,
+            'lr': self._inscribed_rectangle(polygon, lr_resolution)
+        }
+        
+        # 古いインデックス・マスク・サブセットを破棄
+        self._bbox_cache = {k: v for k, v in self._bbox_cache.items() if k[1] != name}
+        self._mask_cache = {k: v for k, v in self._mask_cache.items() if k[1] != name}
+        with self._memory_cache_lock:
+            for sub_key in [k for k in self._sub_cache if k[1] == name]:
+                del self._sub_cache[sub_key]
+        self._build_region_index()
+        
+        print(f"  🗺️ 地域登録: {name}")
+    
+    @staticmethod
+    def _inscribed_rectangle(polygon, resolution=64):
+        """
+        ポリゴンに内接する軸平行矩形を近似計算
+        
+        MBRを resolution x resolution のセルに分割し、ポリゴンに完全に含まれる
+        セルの中で最大面積の矩形を探索する（ヒストグラム法、O(セル数)）。
+        
+        Args:
+            polygon (shapely.geometry.Polygon): 地域境界
+            resolution (int): 分割数
+            
+        Returns:
+            tuple: (lon_min, lat_min, lon_max, lat_max)、見つからない場合はNone
+        """
+        lon_min, lat_min, lon_max, lat_max = polygon.bounds
+        lon_edges = np.linspace(lon_min, lon_max, resolution + 1)
+        lat_edges = np.linspace(lat_min, lat_max, resolution + 1)
+        
+        prepared = prep(polygon)
+        inside = np.array([
+            [prepared.contains(box(lon_edges[j], lat_edges[i], lon_edges[j + 1], lat_edges[i + 1]))
+             for j in range(resolution)]
+            for i in range(resolution)
+        ])
+        
+        # 各行を底辺とするヒストグラムで最大矩形を探索
+        best_area, best = 0, None
+        heights = np.zeros(resolution, dtype=int)
+        for i in range(resolution):
+            heights = np.where(inside[i], heights + 1, 0)
+            stack = []
+            for j in range(resolution + 1):
+                h = heights[j] if j < resolution else 0
+                start = j
+                while stack and stack[-1][1] >= h:
+                    start, height = stack.pop()
+                    area = height * (j - start)
+                    if area > best_area:
+                        best_area, best = area, (i - height + 1, i + 1, start, j)
+                stack.append((start, h))
+        
+        if best is None:
+            return None
+        
+        i0, i1, j0, j1 = best
+        return (lon_edges[j0], lat_edges[i0], lon_edges[j1], lat_edges[i1])
+    
+    def _get_polygon_mask(self, subset, name, grid_key):
+        """
+        MBRサブセット上のポリゴン内外マスクを取得（キャッシュ付き）
+        
+        Args:
+            subset (xarray.Dataset): MBRで切り出したデータセット
+            name (str): 地域名
+            grid_key (tuple): 元データセットのグリッド署名
+            
+        Returns:
+            numpy.ndarray: (lat, lon) のboolマスク
+        """
+        cache_key = (grid_key, name)
+        mask = self._mask_cache.get(cache_key)
+        if mask is not None:
+            return mask
+        
+        region = self.region_polygons[name]
+        lat = subset['lat'].values
+        lon = subset['lon'].values
+        
+        # 内接矩形内のセルは無条件に採用
+        lr = region['lr']
+        if lr is not None:
+            lr_lon_min, lr_lat_min, lr_lon_max, lr_lat_max = lr
+            lat_in = (lat >= lr_lat_min) & (lat <= lr_lat_max)
+            lon_in = (lon >= lr_lon_min) & (lon <= lr_lon_max)
+            mask = np.outer(lat_in, lon_in)
+        else:
+            mask = np.zeros((lat.size, lon.size), dtype=bool)
+        
+        # MBRとLRの間の帯状領域のみポリゴン判定（境界上のセルも含む: LR・矩形大陸と同じ閉区間）
+        rows, cols = np.nonzero(~mask)
+        if rows.size:
+            mask[rows, cols] = intersects_xy(region['polygon'], lon[cols], lat[rows])
+        
+        self._mask_cache[cache_key] = mask
+        return mask
+    
+    def _build_region_index(self):
+        """continent_bounds の外接矩形から R-tree を構築（rtree 利用可能時のみ）"""
+        if not RTREE_AVAILABLE:
+            self._region_index = None
+            return
+        
+        index = rtree.index.Index()
+        for i, (name, bounds) in enumerate(self.continent_bounds.items()):
+            lat_min, lat_max = bounds['lat_range']
+            lon_min, lon_max = bounds['lon_range']
+            index.insert(i, (lon_min, lat_min, lon_max, lat_max), obj=name)
+        self._region_index = index
+    
+    def regions_intersecting(self, lat_range, lon_range):
+        """
+        指定矩形と外接矩形が重なる地域を検索
+        
+        Args:
+            lat_range (tuple): (緯度下限, 緯度上限)
+            lon_range (tuple): (経度下限, 経度上限)
+            
+        Returns:
+            list: 地域名のリスト（登録順）
+        """
+        lat_min, lat_max = lat_range
+        lon_min, lon_max = lon_range
+        
+        if self._region_index is not None:
+            # R-tree のIDは登録順なのでIDでソートすれば登録順になる
+            hits = self._region_index.intersection((lon_min, lat_min, lon_max, lat_max), objects=True)
+            return [item.object for item in sorted(hits, key=lambda item: item.id)]
+        
+        return [
+            name for name, bounds in self.continent_bounds.items()
+            if bounds['lat_range'][0] <= lat_max and lat_min <= bounds['lat_range'][1]
+            and bounds['lon_range'][0] <= lon_max and lon_min <= bounds['lon_range'][1]
+        ]
+    
+    def regions_containing(self, lat, lon):
+        """
+        指定地点を含む地域を検索
+        
+        外接矩形をR-treeで絞り込み、ポリゴン境界を持つ地域はポリゴンで判定する。
+        
+        Args:
+            lat (float): 緯度
+            lon (float): 経度
+            
+        Returns:
+            list: 地域名のリスト（登録順）
+        """
+        candidates = self.regions_intersecting((lat, lat), (lon, lon))
+        
+        result = []
+        for name in candidates:
+            region = self.region_polygons.get(name)
+            # 境界上の点も含む（矩形地域の判定と揃える）
+            if region is None or region['polygon'].covers(Point(lon, lat)):
+                result.append(name)
+        return result
+    
+    def calculate_land_cover_statistics(self, dataset):
+        """
+        土地被覆クラス別のセル数と焼損面積を計算
+        
+        np.bincount による1回の走査でクラス別に集計する。
+        
+        Args:
+            dataset (xarray.Dataset): データセット（land_cover 必須）
+            
+        Returns:
+            dict: class_cells / class_burned_area（クラス値 -> 値、セルが存在するクラスのみ）
+        """
+        if 'land_cover' not in dataset.data_vars:
+            return {}
+        
+        land_cover = np.asarray(dataset['land_cover'].values)
+        # NaN・クラス範囲外の欠損値（負値や大きな fill value）は集計対象外
+        # （bincount は負値を扱えず、巨大な値では最大値分の配列を確保してしまう）
+        if land_cover.dtype.kind in 'fiu':
+            valid = (land_cover >= 0) & (land_cover <= N_LAND_COVER_CLASSES)
+            if valid.all():
+                valid = None
+        else:
+            valid = None
+        if valid is not None:
+            land_cover = land_cover[valid]
+        land_cover = land_cover.astype(np.intp, copy=False).ravel()
+        minlength = N_LAND_COVER_CLASSES + 1
+        
+        cell_counts = np.bincount(land_cover, minlength=minlength)
+        classes = np.nonzero(cell_counts)[0]
+        result = {'class_cells': {int(c): int(cell_counts[c]) for c in classes}}
+        
+        if 'burned_area' in dataset.data_vars:
+            burned_area = np.asarray(dataset['burned_area'].values)
+            if valid is not None:
+                burned_area = burned_area[valid]
+            weights = np.nan_to_num(burned_area.ravel(), nan=0.0)
+            burned = np.bincount(land_cover, weights=weights, minlength=minlength)
+            result['class_burned_area'] = {int(c): float(burned[c]) for c in classes}
+        
+        return result
+    
     def calculate_statistics(self, dataset):
         """
         データセット統計を計算
         
+        各変数の合計・最大・平均・閾値超過セル数を1回の集約パスで計算する。
+        dask配列の変数は全変数分のリダクションを1回の dask.compute にまとめる。
+        
         Args:
             dataset (xarray.Dataset): データセット
             
@@ -271,23 +1576,161 @@ class CEDAFireCCIClient:
             dict: 統計情報
         """
         stats = {}
+        ba = dataset['burned_area'] if 'burned_area' in dataset.data_vars else None
+        conf = dataset['confidence'] if 'confidence' in dataset.data_vars else None
         
-        if 'burned_area' in dataset.data_vars:
-            ba = dataset['burned_area']
-            stats['total_burned_area'] = float(ba.sum())
-            stats['max_burned_area'] = float(ba.max())
-            stats['mean_burned_area'] = float(ba.mean())
-            stats['active_cells'] = int((ba > 0).sum())
+        ba_stats = conf_stats = None
+        if self._can_fuse(ba, conf):
+            ba_stats, conf_stats = self._reduce_stats_fused(ba, conf, 0.0, 0.8)
+        else:
+            ba_stats, conf_stats = self._reduce_stats_many([(ba, 0.0), (conf, 0.8)])
+        
+        if ba_stats is not None:
+            total, max_value, mean, active = ba_stats
+            stats['total_burned_area'] = total
+            stats['max_burned_area'] = max_value
+            stats['mean_burned_area'] = mean
+            stats['active_cells'] = active
         
-        if 'confidence' in dataset.data_vars:
-            conf = dataset['confidence']
-            stats['mean_confidence'] = float(conf.mean())
-            stats['high_confidence_cells'] = int((conf > 0.8).sum())
+        if conf_stats is not None:
+            _, _, mean, high = conf_stats
+            stats['mean_confidence'] = mean
+            stats['high_confidence_cells'] = high
         
         stats['total_cells'] = int(dataset.lat.size * dataset.lon.size)
         
         return stats
-
+    
+    def _reduce_stats(self, data_array, threshold):
+        """
+        numpy配列の合計・最大・平均・閾値超過セル数をまとめて計算
+        
+        Numbaカーネル（利用可能な場合）の1回の走査で集約する。
+        dask配列は _reduce_stats_many で全変数まとめて評価する。
+        
+        Args:
+            data_array (xarray.DataArray): 対象変数（numpy配列ベース）
+            threshold (float): セル数カウントの閾値（より大きい値を計数）
+            
+        Returns:
+            tuple: (合計, 最大, 平均, 閾値超過セル数)
+        """
+        values = np.asarray(data_array.data)
+        if NUMBA_AVAILABLE:
+            total, max_value, n_valid, n_above = _array_stats(_as_2d(values), threshold)
+        else:
+            valid = ~np.isnan(values)
+            n_valid = int(valid.sum())
+            total = float(values[valid].sum())
+            max_value = float(values[valid].max()) if n_valid else np.nan
+            n_above = int((values > threshold).sum())
+        
+        return self._finalize_stats(total, max_value, n_valid, n_above)
+    
+    def _reduce_stats_many(self, items):
+        """
+        複数変数の統計をまとめて計算
+        
+        dask配列の変数はリダクションを1つのリストに集め、1回の dask.compute で
+        評価する（チャンク読み込みとリダクションを全変数で共有）。
+        
+        Args:
+            items (list): (xarray.DataArray または None, 閾値) のリスト
+            
+        Returns:
+            list: 各変数の (合計, 最大, 平均, 閾値超過セル数)、変数がNoneの場合はNone
+        """
+        results = [None] * len(items)
+        tasks = []
+        lazy_indices = []
+        
+        for i, (data_array, threshold) in enumerate(items):
+            if data_array is None:
+                continue
+            if isinstance(data_array.data, da.Array):
+                tasks.extend(self._dask_stats_tasks(data_array.data, threshold))
+                lazy_indices.append(i)
+            else:
+                results[i] = self._reduce_stats(data_array, threshold)
+        
+        if tasks:
+            values = dask.compute(*tasks, scheduler='threads')
+            for k, i in enumerate(lazy_indices):
+                results[i] = self._finalize_stats(*values[4 * k:4 * k + 4])
+        
+        return results
+    
+    @staticmethod
+    def _dask_stats_tasks(data, threshold):
+        """
+        dask配列の統計リダクション（未評価）を構築
+        
+        Args:
+            data (dask.array.Array): 対象配列
+            threshold (float): セル数カウントの閾値
+            
+        Returns:
+            list: [合計, 最大, 有効セル数, 閾値超過セル数] の遅延リダクション
+        """
+        return [
+            da.nansum(data),
+            da.nanmax(data),
+            da.count_nonzero(~da.isnan(data)),
+            _count_gt_dask(data, threshold) if NUMBA_AVAILABLE else (data > threshold).sum()
+        ]
+    
+    def _can_fuse(self, ba, conf):
+        """
+        焼損面積と信頼度を1回の走査で集約できるか判定
+        
+        Args:
+            ba (xarray.DataArray): 焼損面積（またはNone）
+            conf (xarray.DataArray): 信頼度（またはNone）
+            
+        Returns:
+            bool: 融合カーネルを使用可能か
+        """
+        if not NUMBA_AVAILABLE or ba is None or conf is None:
+            return False
+        if isinstance(ba.data, da.Array) or isinstance(conf.data, da.Array):
+            return False
+        return ba.shape == conf.shape
+    
+    def _reduce_stats_fused(self, ba, conf, ba_threshold, conf_threshold):
+        """
+        焼損面積と信頼度の統計を1回の走査で計算
+        
+        Args:
+            ba (xarray.DataArray): 焼損面積
+            conf (xarray.DataArray): 信頼度
+            ba_threshold (float): 焼損面積の閾値
+            conf_threshold (float): 信頼度の閾値
+            
+        Returns:
+            tuple: (焼損面積統計, 信頼度統計) 各々 (合計, 最大, 平均, 閾値超過セル数)
+        """
+        result = _fused_stats(_as_2d(ba.data), _as_2d(conf.data), ba_threshold, conf_threshold)
+        return self._finalize_stats(*result[:4]), self._finalize_stats(*result[4:])
+    
+    def _finalize_stats(self, total, max_value, n_valid, n_above):
+        """
+        集約結果をPythonスカラーに変換し平均を算出
+        
+        Args:
+            total: 合計
+            max_value: 最大
+            n_valid: 有効（非NaN）セル数
+            n_above: 閾値超過セル数
+            
+        Returns:
+            tuple: (合計, 最大, 平均, 閾値超過セル数)
+        """
+        n_valid = int(n_valid)
+        max_value = float(max_value) if n_valid else np.nan
+        mean = float(total) / n_valid if n_valid else np.nan
+        
+        return float(total), max_value, mean, int(n_above)
+    
 def test_ceda_client():
     """CEDA クライアントテスト"""
     print("🧪 CEDA Fire_cci クライアントテスト")
@@ -25,10 +25,11 @@ except ImportError:
 
 # CEDA クライアントをインポート
 try:
-    from ceda_client import CEDAFireCCIClient
+    from ceda_client import CEDAFireCCIClient, N_LAND_COVER_CLASSES
     CEDA_CLIENT_AVAILABLE = True
 except ImportError:
     CEDA_CLIENT_AVAILABLE = False
+    N_LAND_COVER_CLASSES = 18
     print("⚠️ CEDA クライアントが利用できません")
 
 class MultiModalFireFeatureProcessor:
@@ -187,7 +188,14 @@ class MultiModalFireFeatureProcessor:
             # 3. 土地被覆特徴量
             if 'land_cover' in subset.data_vars:
                 lc = subset['land_cover'].values
-                unique_classes, counts = np.unique(lc, return_counts=True)
+                if (np.issubdtype(lc.dtype, np.integer) and lc.size
+                        and lc.min() >= 0 and lc.max() <= N_LAND_COVER_CLASSES):
+                    # クラス範囲内の整数は bincount で1回の走査で集計（範囲外の欠損値を含む場合は np.unique）
+                    class_counts = np.bincount(lc.ravel())
+                    unique_classes = np.nonzero(class_counts)[0]
+                    counts = class_counts[unique_classes]
+                else:
+                    unique_classes, counts = np.unique(lc, return_counts=True)
                 
                 features['land_cover'] = {
                     'dominant_class': int(unique_classes[np.argmax(counts)]),